@@ -2,21 +2,37 @@
 FastAPI backend for Revomate AI Consultant chatbot.
 """
 
+import os
+import re
+import json
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 try:
-    from .rag_engine import get_rag_engine
+    from .rag_engine import get_rag_engine, warm_jit_kernels
 except (ImportError, ValueError):
-    from rag_engine import get_rag_engine
+    from rag_engine import get_rag_engine, warm_jit_kernels
 import uvicorn
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Revomate AI Consultant API",
     description="RAG-based AI consultant for Revomate business automation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
+
+# Vercel preview URLs are <project>-<hash>-<scope>.vercel.app or
+# <project>-git-<branch>-<scope>.vercel.app. Anyone can create a project named
+# zymnix-*, so only the team scope suffix identifies our previews. Without
+# VERCEL_PREVIEW_SCOPE set, preview origins are not allowed at all.
+VERCEL_PREVIEW_SCOPE = os.getenv("VERCEL_PREVIEW_SCOPE")
+PREVIEW_ORIGIN_REGEX = (
+    rf"https://(revomate|zymnix)-[a-z0-9-]+-{re.escape(VERCEL_PREVIEW_SCOPE)}\.vercel\.app"
+    if VERCEL_PREVIEW_SCOPE else None
 )
 
 # Configure CORS for frontend access
@@ -25,7 +41,6 @@ app.add_middleware(
     allow_origins=[
         "http://localhost:3000", 
         "http://localhost:3001",
-        "https://*.vercel.app",
         "https://revomate.vercel.app",
         "https://revomate-backend.vercel.app",
         "https://zymnix.vercel.app",
@@ -33,11 +48,30 @@ app.add_middleware(
         "https://revomate-ai.com",
         "https://www.revomate-ai.com"
     ],
+    # Starlette does not expand wildcards in allow_origins, so previews need a regex
+    allow_origin_regex=PREVIEW_ORIGIN_REGEX,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
+# Endpoints that stream Server-Sent Events
+STREAMING_PATHS = {"/api/chat/stream"}
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that skips SSE endpoints, where compression would buffer tokens."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress larger (text-heavy) chat responses
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1000)
+
 
 # Request/Response Models
 class Message(BaseModel):
@@ -65,7 +99,7 @@ class HealthResponse(BaseModel):
     documents_loaded: int
 
 
-# Initialize RAG engine on startup
+# Warm the cached RAG engine on startup so the first request does not pay for it
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG engine when server starts."""
@@ -76,11 +110,13 @@ async def startup_event():
         if doc_count == 0:
             print("⚠️  Knowledge base is empty. Running automatic ingestion...")
             from ingest_data import main as run_ingestion
-            run_ingestion()
+            run_ingestion(rag)
             doc_count = len(rag.knowledge_base)
             print(f"✅ Auto-ingestion complete. Loaded {doc_count} chunks.")
         else:
             print(f"✅ RAG engine loaded with {doc_count} knowledge chunks")
+        # numba compiles per worker; do it now rather than on the first chat
+        warm_jit_kernels()
     except Exception as e:
         print(f"❌ Error initializing RAG engine: {e}")
 
@@ -105,7 +141,9 @@ async def health_check():
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
 
-@app.post("/api/chat", response_model=ChatResponse)
+# ChatResponse is only documented (responses=), not used as response_model, so the
+# returned dict is serialized directly without a second validation pass
+@app.post("/api/chat", responses={200: {"model": ChatResponse}})
 async def chat(request: ChatRequest):
     """
     Chat endpoint for conversing with Revomate AI Consultant.
@@ -114,27 +152,61 @@ async def chat(request: ChatRequest):
         request: ChatRequest with user message and optional chat history
     
     Returns:
-        ChatResponse with assistant's reply
+        Dict shaped like ChatResponse with assistant's reply
     """
     try:
         rag = get_rag_engine()
         
         # Convert Pydantic models to dicts for RAG engine
-        history = [{"role": msg.role, "content": msg.content} for msg in request.chat_history]
+        history = [{"role": msg.role, "content": msg.content} for msg in request.chat_history or []]
         
         # Generate response
-        result = rag.generate_response(
+        result = await rag.generate_response(
             query=request.message,
             chat_history=history if history else None
         )
         
-        return ChatResponse(
-            response=result["response"],
-            tokens_used=result.get("tokens")  # Robustly handle missing tokens
-        )
+        return {
+            "response": result["response"],
+            "tokens_used": result.get("tokens")  # Robustly handle missing tokens
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /api/chat using Server-Sent Events.
     
+    Emits `data: {"delta": "..."}` events as tokens arrive and a final
+    `data: [DONE]`. Clients that need a single JSON body should use /api/chat.
+    """
+    try:
+        rag = get_rag_engine()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+    
+    history = [{"role": msg.role, "content": msg.content} for msg in request.chat_history or []]
+    
+    async def event_stream():
+        try:
+            async for delta in rag.stream_response(
+                query=request.message,
+                chat_history=history if history else None
+            ):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield f"data: {json.dumps({'error': f'Chat error: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/api/greeting")
@@ -149,10 +221,17 @@ async def get_greeting():
 
 # Development server runner
 if __name__ == "__main__":
+    # Auto-reload is for local development only and requires a single worker
+    reload = os.getenv("UVICORN_RELOAD", "").lower() in ("1", "true")
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if reload else os.cpu_count(),
+        reload=reload,
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
         log_level="info"
     )
@@ -5,10 +5,14 @@ Ingestion script for the lightweight Revomate RAG engine.
 import os
 from rag_engine import RevomateRAG
 
-def main():
-    """Ingest training data into JSON knowledge base."""
+def main(rag: RevomateRAG = None):
+    """Ingest training data into JSON knowledge base.
+    
+    Pass the running engine to refresh it in place; otherwise a new one is created.
+    """
     # Initialize RAG engine
-    rag = RevomateRAG()
+    if rag is None:
+        rag = RevomateRAG()
     
     # Get paths from env
     data_path = os.getenv("DATA_PATH", "./data/revomate_rag_expanded.txt")
@@ -53,28 +53,55 @@ I'm here to help you reclaim your time and scale your business using AI. Whether
 • 🚀 **Something else?** Let's build it.
 """
 
-def format_prompt(context: str, question: str, chat_history: list = None) -> str:
-    """
-    Format the prompt with context and conversation history.
-    """
-    history_str = ""
-    if chat_history:
-        history_str = "\n\n## Conversation Status\n"
-        for msg in chat_history[-6:]:
-            role = "Client" if msg["role"] == "user" else "Consultant"
-            history_str += f"{role}: {msg['content']}\n"
-    
-    prompt = f"""{SYSTEM_PROMPT}
+# Character budget for the conversation history included in each prompt
+MAX_HISTORY_CHARS = 4000
 
-## Strategic Knowledge Base (Internal Revomate Intelligence)
+# Per-request user message; only the placeholders change between requests
+PROMPT_TEMPLATE = """## Strategic Knowledge Base (Internal Revomate Intelligence)
 {context}
 
-{history_str}
+{history}
 
 ## Current Client Inquiry
 {question}
 
 ## Your Strategic Advice
 (Remember: Synthesize the knowledge above. STRICTLY NO ASTERISKS OR BOLDING. Provide contact info only if asked. Speak as the human consultant.)"""
+
+def _fit_history(messages: list, budget: int) -> list:
+    """
+    Labelled turns, oldest first, whose newline-joined length fits in `budget`.
+    
+    Whole turns are dropped from the oldest end so every kept turn keeps its
+    speaker label. Only a newest turn that exceeds the budget on its own is
+    trimmed, keeping its label and the end of its content.
+    """
+    kept = []
+    used = 0
+    for msg in reversed(messages):
+        label = f"{'Client' if msg['role'] == 'user' else 'Consultant'}: "
+        turn = label + msg['content']
+        cost = len(turn) + (1 if kept else 0)  # joining newline
+        if used + cost > budget:
+            if not kept:
+                room = budget - len(label) - 1
+                kept.append(label + "…" + msg['content'][-room:] if room > 0 else label.rstrip())
+            break
+        kept.append(turn)
+        used += cost
+    return kept[::-1]
+
+
+def format_prompt(context: str, question: str, chat_history: list = None) -> str:
+    """
+    Format the per-request user message with context and conversation history.
+    
+    SYSTEM_PROMPT is not included; it is sent as a separate system message so
+    the provider can cache the identical prefix across requests.
+    """
+    history_str = ""
+    if chat_history:
+        turns = "\n".join(_fit_history(chat_history[-6:], MAX_HISTORY_CHARS))
+        history_str = "\n\n## Conversation Status\n" + turns + "\n"
     
-    return prompt
+    return PROMPT_TEMPLATE.format_map({"context": context, "history": history_str, "question": question})
@@ -4,11 +4,16 @@ Uses JSON storage and Cosine Similarity to stay within Vercel's 250MB limit.
 """
 
 import os
-import json
+import re
+import asyncio
+import hashlib
+import threading
+from functools import lru_cache
 import numpy as np
-from typing import List, Dict, Any
+import orjson
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq
 
 try:
     from .prompts import SYSTEM_PROMPT, format_prompt, GREETING_MESSAGE
@@ -17,6 +22,213 @@ except (ImportError, ValueError):
 
 load_dotenv()
 
+EMBEDDING_DIM = 384
+# Below this many chunks a brute-force scan beats walking an HNSW graph
+HNSW_MIN_CHUNKS = 512
+# Queries at least this similar to a cached one reuse its response
+SEMANTIC_CACHE_THRESHOLD = 0.97
+SEMANTIC_CACHE_SIZE = 1024
+# One "### 🧩 CHUNK <header>" block per match, body running up to the next marker
+CHUNK_PATTERN = re.compile(r"### 🧩 CHUNK([^\n]*)\n(.*?)(?=### 🧩 CHUNK|\Z)", re.S)
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+HASH_DIGEST_SIZE = 32
+# Element positions 0..383 for the vectorized hash embedding
+_HASH_POSITIONS = np.arange(EMBEDDING_DIM, dtype=np.uint32)
+
+
+def _hash_embed_kernel(digests: np.ndarray) -> np.ndarray:
+    """Expand (N, 32) uint8 digests into unit-length (N, 384) float64 hash embeddings."""
+    n, size = digests.shape
+    embeddings = np.empty((n, EMBEDDING_DIM), dtype=np.float64)
+    raw = np.empty(EMBEDDING_DIM, dtype=np.uint32)
+    for r in range(n):
+        for i in range(EMBEDDING_DIM):
+            raw[i] = (np.uint32(digests[r, i % size]) * np.uint32(i + 1)) % np.uint32(256)
+        # Reinterpret the bits as float32 (same as struct.pack('I') -> unpack('f')).
+        # The values are denormals, so normalize in float64 and without fastmath.
+        row = raw.view(np.float32).astype(np.float64)
+        norm = np.sqrt(np.sum(row * row))
+        if norm > 0:
+            row /= norm
+        embeddings[r] = row
+    return embeddings
+
+
+# Compiled when numba is installed; otherwise _hash_embeddings uses the NumPy expression
+_hash_embed_jit = njit(cache=True)(_hash_embed_kernel) if njit else None
+
+
+# Below any cosine similarity; frozen into the kernel as a compile-time constant
+_TOP_K_SENTINEL = np.finfo(np.float32).min
+
+
+def _top_k_kernel(matrix: np.ndarray, q: np.ndarray, k: int) -> np.ndarray:
+    """Stream the matrix once, keeping the k best rows in a sorted buffer (best-first)."""
+    n, d = matrix.shape
+    # Finite sentinel: fastmath assumes no infinities, so -inf would be undefined
+    top_scores = np.full(k, _TOP_K_SENTINEL, dtype=np.float32)
+    top_idx = np.zeros(k, dtype=np.int64)
+    for r in range(n):
+        s = np.float32(0.0)
+        for c in range(d):
+            s += matrix[r, c] * q[c]
+        if s > top_scores[k - 1]:
+            # Insertion into the descending buffer; k is tiny so this beats a heap
+            j = k - 1
+            while j > 0 and top_scores[j - 1] < s:
+                top_scores[j] = top_scores[j - 1]
+                top_idx[j] = top_idx[j - 1]
+                j -= 1
+            top_scores[j] = s
+            top_idx[j] = r
+    return top_idx
+
+
+# For small KBs the fused loop avoids matmul/argpartition dispatch overhead.
+# fastmath is safe here: KB rows and queries are unit vectors, not denormals.
+_top_k_jit = njit(cache=True, fastmath=True)(_top_k_kernel) if njit else None
+
+
+def warm_jit_kernels():
+    """Compile (or load from cache) the numba kernels so the first request doesn't pay for it."""
+    # Same argument types as the hot path: frombuffer digests and cached
+    # query embeddings are read-only, which numba compiles separately.
+    digests = np.frombuffer(bytes(HASH_DIGEST_SIZE), dtype=np.uint8).reshape(-1, HASH_DIGEST_SIZE)
+    q = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    q.flags.writeable = False
+    if _hash_embed_jit is not None:
+        _hash_embed_jit(digests)
+    if _top_k_jit is not None:
+        _top_k_jit(np.zeros((1, EMBEDDING_DIM), dtype=np.float32), q, 1)
+
+
+def _hash_digests(texts: List[str]) -> np.ndarray:
+    """BLAKE2b digest of each text as one (N, 32) uint8 array."""
+    # BLAKE2b is faster than SHA-256 and the hash only needs to be deterministic
+    return np.frombuffer(
+        b"".join(hashlib.blake2b(text.encode('utf-8'), digest_size=HASH_DIGEST_SIZE).digest() for text in texts),
+        dtype=np.uint8,
+    ).reshape(-1, HASH_DIGEST_SIZE)
+
+
+def _hash_embeddings(texts: List[str]) -> np.ndarray:
+    """Deterministic hash-based embeddings (N, 384), used when no model is available.
+    
+    Ingestion and queries both go through here, so KB rows and query vectors match.
+    """
+    digests = _hash_digests(texts)
+    if _hash_embed_jit is not None:
+        return _hash_embed_jit(digests)
+    
+    # Vectorized form of the original per-element
+    # struct.unpack('f', struct.pack('I', byte * (i + 1) % 256)) loop
+    raw = (digests[:, _HASH_POSITIONS % HASH_DIGEST_SIZE].astype(np.uint32) * (_HASH_POSITIONS + 1)) & 0xFF
+    # Normalize in float64: the raw values are denormal floats whose squares
+    # underflow in float32, and an additive epsilon would swamp the norm.
+    embeddings = raw.view(np.float32).astype(np.float64)
+    norms = np.sqrt(np.einsum('ij,ij->i', embeddings, embeddings))[:, None]
+    return embeddings / np.maximum(norms, np.finfo(np.float64).tiny)
+
+
+def _hash_embedding(text: str) -> np.ndarray:
+    """Hash-based embedding of a single text (one row of _hash_embeddings)."""
+    return _hash_embeddings([text])[0]
+
+
+@lru_cache(maxsize=2048)
+def _embed(text: str) -> np.ndarray:
+    """Memoized single-text embedding. The array is shared, so it is read-only."""
+    if _EMBED is not None:
+        embedding = _EMBED.encode(text, normalize_embeddings=True)
+    else:
+        embedding = _hash_embedding(text)
+    embedding = np.asarray(embedding, dtype=np.float32)
+    embedding.flags.writeable = False
+    return embedding
+
+
+# Loaded once per process. Without sentence-transformers installed (e.g. on
+# Vercel, where torch does not fit), or if the model can't be loaded, we fall
+# back to the hash-based embedding.
+_EMBED_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+_EMBED = None
+if SentenceTransformer is not None:
+    try:
+        _EMBED = SentenceTransformer(_EMBED_MODEL_NAME)
+    except Exception as e:
+        print(f"⚠️  Could not load embedding model {_EMBED_MODEL_NAME}: {e}. Using hash embeddings.")
+
+# Stored with the KB; a KB built by a different embedder is stale and gets re-ingested.
+# Bump the hash version whenever the hash embedding's output changes.
+EMBEDDING_VERSION = f"sentence-transformers/{_EMBED_MODEL_NAME}" if _EMBED is not None else "hash-blake2b-v1"
+
+
+def _tmp_path(path: str) -> str:
+    """Temporary sibling of `path` that keeps its extension (np.save appends .npy otherwise).
+    
+    The pid keeps it unique per writer: with several uvicorn workers, each one
+    may re-ingest at startup, and a shared temp file would be truncated under
+    another worker's os.replace.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}.tmp{ext}"
+
+
+class SemanticCache:
+    """Bounded LRU cache of responses, looked up by query embedding similarity."""
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.vectors = None  # (max_entries, D) float32, allocated on first put
+        self.answers: List[Optional[Dict]] = [None] * max_entries
+        self.last_used = np.zeros(max_entries, dtype=np.int64)
+        self.size = 0
+        self._clock = 0
+
+    def get(self, query_vec: np.ndarray) -> Optional[Dict]:
+        """Return the cached response for the most similar query above the threshold."""
+        if self.size == 0:
+            return None
+        sims = self.vectors[:self.size] @ query_vec
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        self._clock += 1
+        self.last_used[best] = self._clock
+        return self.answers[best]
+
+    def put(self, query_vec: np.ndarray, answer: Dict):
+        """Cache a response, evicting the least recently used entry when full."""
+        if self.vectors is None:
+            self.vectors = np.zeros((self.max_entries, len(query_vec)), dtype=np.float32)
+        if self.size < self.max_entries:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))
+        self._clock += 1
+        self.vectors[slot] = query_vec
+        self.answers[slot] = answer
+        self.last_used[slot] = self._clock
+
+
 class RevomateRAG:
     """Lightweight RAG system for Revomate AI Consultant."""
     
@@ -48,28 +260,123 @@ class RevomateRAG:
             self.kb_path = tmp_kb_path
             self.read_only = False
             
-        self.groq_client = Groq(api_key=self.groq_api_key)
+        self.groq_client = AsyncGroq(api_key=self.groq_api_key)
         self.knowledge_base = self._load_kb()
+        self.embedding_matrix = self._load_embeddings()
+        self.index = self._load_index()
+        self.response_cache = SemanticCache()
         
         print(f"✅ Lightweight RAG Engine initialized. KB size: {len(self.knowledge_base)} chunks.")
 
     def _load_kb(self) -> List[Dict]:
-        """Load knowledge base from JSON."""
+        """Load knowledge base chunk metadata from JSON."""
         # Try loading from current kb_path
         if os.path.exists(self.kb_path):
             try:
-                with open(self.kb_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.kb_path, 'rb') as f:
+                    data = orjson.loads(f.read())
             except Exception as e:
                 print(f"❌ Error loading KB from {self.kb_path}: {e}")
                 return []
+            # Older KBs are a bare list of chunks, embedded with SHA-256 hashes
+            version = data.get("embedding_version") if isinstance(data, dict) else None
+            if version != EMBEDDING_VERSION:
+                print(f"⚠️  KB at {self.kb_path} was embedded with {version or 'hash-sha256'}, "
+                      f"but {EMBEDDING_VERSION} is active. Re-ingestion required.")
+                return []
+            chunks = data.get("chunks")
+            if not isinstance(chunks, list) or not all(isinstance(c, dict) for c in chunks):
+                print(f"⚠️  KB at {self.kb_path} has no valid chunk list. Re-ingestion required.")
+                return []
+            return chunks
         
         # If we are using /tmp and it doesn't exist, we might have it in the package but missed it?
         # (This is handled by __init__ check, so we are good)
         return []
 
+    @property
+    def embeddings_path(self) -> str:
+        """Path of the .npy file holding the int8 embedding matrix, next to the JSON."""
+        return os.path.splitext(self.kb_path)[0] + ".npy"
+
+    @property
+    def scales_path(self) -> str:
+        """Path of the .npy file holding the per-row dequantization scales."""
+        return os.path.splitext(self.kb_path)[0] + ".scales.npy"
+
+    @property
+    def index_path(self) -> str:
+        """Path of the HNSW index file, only written for large knowledge bases."""
+        return os.path.splitext(self.kb_path)[0] + ".hnsw"
+
+    def _load_embeddings(self) -> np.ndarray:
+        """Load the (N, D) embedding matrix from .npy as contiguous float32."""
+        if not self.knowledge_base:
+            return self._build_embedding_matrix([])
+        if os.path.exists(self.embeddings_path):
+            try:
+                matrix = np.load(self.embeddings_path)
+                if matrix.shape[0] != len(self.knowledge_base):
+                    print(f"⚠️  {self.embeddings_path} does not match KB size. Ignoring it.")
+                else:
+                    return self._dequantize(matrix, np.load(self.scales_path))
+            except Exception as e:
+                print(f"❌ Error loading embeddings from {self.embeddings_path}: {e}")
+        print("⚠️  No embeddings found for the knowledge base. Re-run ingestion.")
+        self.knowledge_base = []
+        return self._build_embedding_matrix([])
+
+    def _build_embedding_matrix(self, embeddings) -> np.ndarray:
+        """Stack embeddings into one contiguous, row-normalized (N, D) float32 matrix."""
+        if len(embeddings) == 0:
+            return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        matrix = np.array(embeddings, dtype=np.float64)
+        # Normalize in float64 so tiny-magnitude rows can't underflow in float32
+        norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix))[:, None]
+        matrix /= np.maximum(norms, np.finfo(np.float64).tiny)
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def _quantize(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Symmetric int8 quantization with one scale per row, for the on-disk format."""
+        max_abs = np.abs(matrix).max(axis=1) if len(matrix) else np.empty(0, dtype=np.float32)
+        scales = (np.maximum(max_abs, np.finfo(np.float32).tiny) / 127.0).astype(np.float32)
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        return quantized, scales
+
+    def _dequantize(self, quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Expand int8 rows back to float32 once at load, so queries score with BLAS."""
+        return np.ascontiguousarray(quantized * scales[:, None], dtype=np.float32)
+
+    def _load_index(self):
+        """Load the HNSW index for large knowledge bases (None -> brute-force scan)."""
+        n = len(self.knowledge_base)
+        if hnswlib is None or n < HNSW_MIN_CHUNKS or not os.path.exists(self.index_path):
+            return None
+        try:
+            index = hnswlib.Index(space='cosine', dim=self.embedding_matrix.shape[1])
+            index.load_index(self.index_path, max_elements=n)
+            if index.get_current_count() != n:
+                print(f"⚠️  {self.index_path} does not match KB size. Ignoring it.")
+                return None
+            index.set_ef(64)
+            return index
+        except Exception as e:
+            print(f"❌ Error loading HNSW index from {self.index_path}: {e}")
+            return None
+
+    def _build_index(self, matrix: np.ndarray):
+        """Build an HNSW index over the float embeddings (None for small KBs)."""
+        n = len(matrix)
+        if hnswlib is None or n < HNSW_MIN_CHUNKS:
+            return None
+        index = hnswlib.Index(space='cosine', dim=matrix.shape[1])
+        index.init_index(max_elements=n, ef_construction=200, M=16)
+        index.add_items(matrix, np.arange(n))
+        index.set_ef(64)
+        return index
+
     def _save_kb(self):
-        """Save knowledge base to JSON."""
+        """Save knowledge base to JSON + .npy."""
         # If we are in read-only mode (using packaged file), we shouldn't overwrite unless we switch to tmp
         if hasattr(self, 'read_only') and self.read_only:
              # But if we are calling save, it means we changed something (ingestion).
@@ -79,112 +386,213 @@ class RevomateRAG:
              self.read_only = False
              
         try:
-            os.makedirs(os.path.dirname(self.kb_path), exist_ok=True)
-            with open(self.kb_path, 'w', encoding='utf-8') as f:
-                json.dump(self.knowledge_base, f, indent=2)
+            self._write_kb()
             print(f"💾 Saved knowledge base to {self.kb_path}")
         except OSError as e:
             # Last ditch fallback
             print(f"❌ Error saving KB to {self.kb_path}: {e}. Trying /tmp fallback...")
             self.kb_path = "/tmp/knowledge_base.json"
-            os.makedirs(os.path.dirname(self.kb_path), exist_ok=True)
-            with open(self.kb_path, 'w', encoding='utf-8') as f:
-                json.dump(self.knowledge_base, f, indent=2)
+            self._write_kb()
 
-    def _get_embedding(self, text: str) -> List[float]:
-        """Deterministic hash-based embedding (384-dim)."""
-        import hashlib
-        import struct
+    def _write_kb(self):
+        """Write chunk metadata to JSON and the quantized embeddings to .npy sidecars."""
+        os.makedirs(os.path.dirname(self.kb_path), exist_ok=True)
+        # Each file goes to a temporary sibling and is renamed into place, so a
+        # crash or a concurrent writer never leaves a truncated KB. The JSON
+        # goes last since its presence is what marks a KB as available.
+        pending = []
+        quantized, scales = self._quantize(self.embedding_matrix)
+        
+        tmp = _tmp_path(self.embeddings_path)
+        np.save(tmp, quantized)
+        pending.append((tmp, self.embeddings_path))
+        
+        tmp = _tmp_path(self.scales_path)
+        np.save(tmp, scales)
+        pending.append((tmp, self.scales_path))
         
-        hash_obj = hashlib.sha256(text.encode())
-        hash_bytes = hash_obj.digest()
+        if self.index is not None:
+            tmp = _tmp_path(self.index_path)
+            self.index.save_index(tmp)
+            pending.append((tmp, self.index_path))
         
-        embedding = []
-        for i in range(0, 384):
-            idx = i % len(hash_bytes)
-            # Match the original hash logic for consistency
-            val = struct.unpack('f', struct.pack('I', hash_bytes[idx] * (i + 1) % 256))[0]
-            embedding.append(val)
+        meta = [{"id": c["id"], "header": c["header"], "content": c["content"]} for c in self.knowledge_base]
+        tmp = _tmp_path(self.kb_path)
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps({"embedding_version": EMBEDDING_VERSION, "chunks": meta}))
+        pending.append((tmp, self.kb_path))
         
-        # Normalize
-        norm = np.linalg.norm(embedding)
-        return (np.array(embedding) / (norm + 1e-9)).tolist()
+        for tmp, path in pending:
+            os.replace(tmp, path)
+
+    def _get_embedding(self, text: str) -> np.ndarray:
+        """Embed a single text (384-dim) with the hash fallback, or the sentence-transformer model if loaded.
+        
+        Repeated queries are served from an LRU cache; the result is read-only.
+        """
+        return _embed(text)
+
+    async def _get_embedding_async(self, text: str) -> np.ndarray:
+        """_get_embedding for async callers: model inference runs off the event loop."""
+        if _EMBED is None:
+            # The hash embedding takes microseconds; a thread hop would cost more
+            return _embed(text)
+        # lru_cache can't be peeked, so hits take the hop too (~tens of µs vs ms per encode)
+        return await asyncio.to_thread(_embed, text)
+
+    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts in one batch (a single forward pass when the model is loaded)."""
+        if _EMBED is not None:
+            return _EMBED.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+        return _hash_embeddings(texts)
 
     def ingest_data(self, file_path: str):
-        """Ingest text data and save to JSON knowledge base."""
+        """Ingest text data and save it as JSON metadata plus a .npy embedding matrix."""
         print(f"Ingesting data from {file_path}...")
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
             
-        chunks = []
-        chunk_parts = content.split('### 🧩 CHUNK')
-        
-        for i, part in enumerate(chunk_parts[1:], 1):
-            lines = part.strip().split('\n', 1)
-            if len(lines) >= 2:
-                header = lines[0].strip()
-                text = lines[1].strip().replace('---', '').strip()
-                full_text = f"{header}\n{text}"
-                
-                chunks.append({
-                    "id": f"chunk_{i:02d}",
-                    "header": header,
-                    "content": text,
-                    "embedding": self._get_embedding(full_text)
-                })
+        # (header, body) pairs in one pass over the file
+        chunks = [
+            {
+                "id": f"chunk_{i:02d}",
+                "header": header.strip(),
+                "content": body.replace('---', '').strip(),
+            }
+            for i, (header, body) in enumerate(CHUNK_PATTERN.findall(content), 1)
+        ]
+        texts = [f"{c['header']}\n{c['content']}" for c in chunks]
+        
+        # Encode all chunks in a single batch instead of one call per chunk
+        embeddings = self._get_embeddings(texts)
         
         self.knowledge_base = chunks
+        matrix = self._build_embedding_matrix(embeddings)
+        self.embedding_matrix = matrix
+        self.index = self._build_index(matrix)
         self._save_kb()
         print(f"✅ Successfully ingested {len(chunks)} chunks.")
 
-    def retrieve_context(self, query: str, top_k: int = 3) -> str:
+    def _scan_top_k(self, q: np.ndarray, k: int) -> np.ndarray:
+        """Brute-force top-k over the whole KB, best-first."""
+        if _top_k_jit is not None and k > 0:
+            return _top_k_jit(self.embedding_matrix, q, k)
+        
+        # One BLAS matrix-vector product (dot product == cosine sim for normalized vectors)
+        scores = self.embedding_matrix @ q
+        
+        # Top-k selection without a full sort
+        idx = np.argpartition(-scores, k - 1)[:k]
+        return idx[np.argsort(-scores[idx])]
+
+    def retrieve_context(self, query: str, top_k: int = 3, query_vec: Optional[np.ndarray] = None) -> str:
         """Find most similar chunks using dot product (normalized vectors)."""
         if not self.knowledge_base:
             return ""
             
-        query_vec = np.array(self._get_embedding(query))
+        q = query_vec if query_vec is not None else np.asarray(self._get_embedding(query), dtype=np.float32)
+        k = min(top_k, len(self.knowledge_base))
         
-        # Calculate scores (dot product is same as cosine sim for normalized vectors)
-        scores = []
-        for chunk in self.knowledge_base:
-            score = np.dot(query_vec, np.array(chunk['embedding']))
-            scores.append((score, chunk))
-            
-        # Sort by score descending
-        scores.sort(key=lambda x: x[0], reverse=True)
+        if self.index is not None:
+            # O(log N) graph walk for large KBs; labels come back best-first
+            labels, _ = self.index.knn_query(q, k=k)
+            idx = labels[0]
+        else:
+            idx = self._scan_top_k(q, k)
         
-        # Format results
-        results = []
-        for i, (score, chunk) in enumerate(scores[:top_k], 1):
-            results.append(f"[Context {i}] {chunk['header']}\n{chunk['content']}\n")
-            
-        return "\n".join(results)
+        # Format results straight from the top-k row indices
+        kb = self.knowledge_base
+        return "\n".join([
+            f"[Context {rank}] {kb[i]['header']}\n{kb[i]['content']}\n"
+            for rank, i in enumerate(idx, 1)
+        ])
 
-    def generate_response(self, query: str, chat_history: List[Dict] = None) -> Dict:
-        """Generate AI response using RAG."""
-        context = self.retrieve_context(query)
+    def _build_messages(self, query: str, chat_history: Optional[List[Dict]], query_vec: np.ndarray) -> Tuple[str, List[Dict]]:
+        """Retrieve context and assemble the chat messages for the LLM."""
+        context = self.retrieve_context(query, query_vec=query_vec)
         prompt = format_prompt(context, query, chat_history)
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+        return context, messages
+
+    async def generate_response(self, query: str, chat_history: List[Dict] = None) -> Dict:
+        """Generate AI response using RAG."""
+        q = await self._get_embedding_async(query)
+        
+        # Only standalone questions are cached: with history the answer depends on the conversation
+        if not chat_history:
+            cached = self.response_cache.get(q)
+            if cached is not None:
+                return cached
+        
+        context, messages = self._build_messages(query, chat_history, q)
         
-        chat_completion = self.groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
+        chat_completion = await self.groq_client.chat.completions.create(
+            messages=messages,
             model=self.model_name,
             temperature=0.7,
             max_tokens=1024,
         )
         
-        return {
+        result = {
             "response": chat_completion.choices[0].message.content,
             "context_used": context,
             "model": self.model_name
         }
+        if not chat_history:
+            self.response_cache.put(q, result)
+        return result
+
+    async def stream_response(self, query: str, chat_history: List[Dict] = None) -> AsyncIterator[str]:
+        """Generate AI response using RAG, yielding text deltas as the LLM produces them."""
+        q = await self._get_embedding_async(query)
+        
+        if not chat_history:
+            cached = self.response_cache.get(q)
+            if cached is not None:
+                yield cached["response"]
+                return
+        
+        context, messages = self._build_messages(query, chat_history, q)
+        
+        stream = await self.groq_client.chat.completions.create(
+            messages=messages,
+            model=self.model_name,
+            temperature=0.7,
+            max_tokens=1024,
+            stream=True,
+        )
+        
+        parts = []
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        
+        if not chat_history:
+            self.response_cache.put(q, {
+                "response": "".join(parts),
+                "context_used": context,
+                "model": self.model_name
+            })
 
     def get_greeting(self) -> str:
         return GREETING_MESSAGE
 
-# Singleton
+# Singleton. lru_cache would not stop two cold-start requests from both
+# constructing the engine, so use double-checked locking instead.
 _instance = None
-def get_rag_engine():
+_instance_lock = threading.Lock()
+
+def get_rag_engine() -> RevomateRAG:
     global _instance
-    if _instance is None:
-        _instance = RevomateRAG()
-    return _instance
+    instance = _instance
+    if instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = RevomateRAG()
+            instance = _instance
+    return instance
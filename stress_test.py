@@ -1,7 +1,14 @@
-import requests
+import asyncio
 import json
 import time
 import os
+import httpx
+
+try:
+    import h2  # noqa: F401 - httpx only speaks HTTP/2 with `pip install httpx[http2]`
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
 
 API_URL = "http://localhost:8000/api/chat"
 
@@ -67,41 +74,53 @@ prompts = [
     "Do you have any case studies on AI for space exploration?" # Testing missing domain data
 ]
 
-results = []
+# Concurrent in-flight requests (bounded so the LLM backend is not flooded)
+MAX_CONCURRENCY = 8
 
-print(f"Begiining Stress Test: 50 Prompts against {API_URL}")
-print("-" * 50)
 
-for i, prompt in enumerate(prompts, 1):
-    print(f"[{i}/50] Testing: {prompt[:50]}...")
-    try:
-        start_time = time.time()
-        response = requests.post(API_URL, json={"message": prompt})
-        duration = time.time() - start_time
-        
-        if response.status_code == 200:
-            data = response.json()
-            results.append({
-                "id": i,
-                "prompt": prompt,
-                "response": data["response"],
-                "tokens": data.get("tokens_used", {}),
-                "duration": round(duration, 2),
-                "status": "SUCCESS"
-            })
-            # Check for markdown bolding (the user hates this)
-            if "**" in data["response"]:
-                print(f"  ⚠️ ALERT: Markdown bolding detected in response {i}")
-        else:
-            print(f"  ❌ FAILED logic: {response.status_code}")
-            results.append({"id": i, "prompt": prompt, "status": "API_ERROR", "code": response.status_code})
+async def run_prompt(client, limiter, i, prompt):
+    """Send one prompt and return its result record."""
+    async with limiter:
+        print(f"[{i}/50] Testing: {prompt[:50]}...")
+        try:
+            start_time = time.perf_counter()
+            response = await client.post(API_URL, json={"message": prompt})
+            duration = time.perf_counter() - start_time
             
-    except Exception as e:
-        print(f"  ❌ FAILED connection: {str(e)}")
-        results.append({"id": i, "prompt": prompt, "status": "CONNECTION_ERROR", "error": str(e)})
+            if response.status_code == 200:
+                data = response.json()
+                # Check for markdown bolding (the user hates this)
+                if "**" in data["response"]:
+                    print(f"  ⚠️ ALERT: Markdown bolding detected in response {i}")
+                return {
+                    "id": i,
+                    "prompt": prompt,
+                    "response": data["response"],
+                    "tokens": data.get("tokens_used", {}),
+                    "duration": round(duration, 2),
+                    "status": "SUCCESS"
+                }
+            else:
+                print(f"  ❌ FAILED logic [{i}]: {response.status_code}")
+                return {"id": i, "prompt": prompt, "status": "API_ERROR", "code": response.status_code}
+                
+        except Exception as e:
+            print(f"  ❌ FAILED connection [{i}]: {str(e)}")
+            return {"id": i, "prompt": prompt, "status": "CONNECTION_ERROR", "error": str(e)}
+
+
+async def run_all():
+    """Run every prompt over one shared client; gather keeps prompt order."""
+    limiter = asyncio.Semaphore(MAX_CONCURRENCY)
+    # A single client multiplexes requests over one connection when the server speaks HTTP/2
+    async with httpx.AsyncClient(http2=HTTP2, timeout=60) as client:
+        return await asyncio.gather(*(run_prompt(client, limiter, i, p) for i, p in enumerate(prompts, 1)))
+
+
+print(f"Begiining Stress Test: 50 Prompts against {API_URL}")
+print("-" * 50)
 
-    # Small delay to avoid rate limiting
-    time.sleep(1)
+results = asyncio.run(run_all())
 
 with open("stress_test_results.json", "w") as f:
     json.dump(results, f, indent=2)
@@ -2,12 +2,13 @@
 Quick script to test which Groq models are currently available.
 """
 import os
+import asyncio
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq
 
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
 
 # Try different model names
 models_to_try = [
@@ -17,15 +18,28 @@ models_to_try = [
     "llama3-groq-70b-8192-tool-use-preview",
 ]
 
-for model in models_to_try:
+
+async def probe(model):
+    """Send a tiny completion to one model; returns (model, ok, detail)."""
     try:
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": "Hi"}],
             max_tokens=10
         )
-        print(f"✅ {model} - WORKS")
-        print(f"   Model used: {completion.model}")
-        break
+        return model, True, completion.model
     except Exception as e:
-        print(f"❌ {model} - FAILED: {str(e)[:100]}")
+        return model, False, str(e)[:100]
+
+
+async def main():
+    # Probe all models concurrently; gather keeps the models_to_try order
+    return await asyncio.gather(*(probe(model) for model in models_to_try))
+
+
+for model, ok, detail in asyncio.run(main()):
+    if ok:
+        print(f"✅ {model} - WORKS")
+        print(f"   Model used: {detail}")
+    else:
+        print(f"❌ {model} - FAILED: {detail}")